@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Anvil Fork Module
+
+This module starts a local anvil node forking a remote RPC endpoint, so the
+integration tests can run against real Sepolia state while controlling the
+chain clock.
+"""
+
+import socket
+import subprocess
+import logging
+import time
+from typing import Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+class AnvilFork:
+    """Runs a local anvil node that forks a remote network"""
+    
+    def __init__(self, fork_url: str, port: Optional[int] = None):
+        self.fork_url = fork_url
+        # A free port by default: on a busy one anvil fails to bind, and the readiness probe
+        # could be answered by whatever node already listens there
+        self.port = port if port is not None else self._free_port()
+        self.rpc_url = f"http://127.0.0.1:{self.port}"
+        self._process: Optional[subprocess.Popen] = None
+    
+    @staticmethod
+    def _free_port() -> int:
+        """Ask the OS for a currently unused local TCP port"""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+    
+    @staticmethod
+    def _chain_id(rpc_url: str, timeout: float) -> int:
+        """Read eth_chainId from an endpoint"""
+        response = requests.post(
+            rpc_url,
+            json={"jsonrpc": "2.0", "id": 1, "method": "eth_chainId", "params": []},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        return int(response.json()["result"], 16)
+    
+    def start(self, timeout: int = 30) -> str:
+        """Start anvil and return its RPC URL once it answers requests"""
+        # The fork keeps the source chain's ID, so the probe can tell our anvil from another node
+        expected_chain_id = self._chain_id(self.fork_url, timeout)
+        logger.info(f"Starting anvil fork on port {self.port}")
+        self._process = subprocess.Popen(
+            ["anvil", "--fork-url", self.fork_url, "--port", str(self.port)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError(f"anvil exited with code {self._process.returncode}")
+            try:
+                chain_id = self._chain_id(self.rpc_url, 2)
+            except (requests.RequestException, ValueError, KeyError):
+                chain_id = None
+            if chain_id is not None:
+                # Only trust the answer if our process is still the one running on the port
+                if self._process.poll() is not None:
+                    raise RuntimeError(f"anvil exited with code {self._process.returncode}")
+                if chain_id != expected_chain_id:
+                    self.stop()
+                    raise RuntimeError(
+                        f"Node on port {self.port} reports chain {chain_id}, expected fork of {expected_chain_id}"
+                    )
+                logger.info(f"Anvil fork ready at {self.rpc_url}")
+                return self.rpc_url
+            time.sleep(0.5)
+        
+        self.stop()
+        raise RuntimeError("Timed out waiting for anvil to start")
+    
+    def stop(self):
+        """Stop the anvil process"""
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        self._process = None
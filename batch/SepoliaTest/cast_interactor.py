@@ -2,130 +2,746 @@
 """
 Cast Interactor Module
 
-This module provides a wrapper class for interacting with Ethereum contracts
-using Foundry's cast command-line tool.
+This module provides a wrapper class for interacting with Ethereum contracts.
+Reads and writes go over a persistent JSON-RPC session (RpcClient) and
+transactions are signed in-process (Signer); Foundry's cast command-line
+tool is kept as a fallback when the RPC session is unavailable.
 """
 
+import functools
+import inspect
+import itertools
+import json
+import os
 import subprocess
 import logging
-from typing import Optional
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from eth_abi import decode, encode
+from eth_abi.exceptions import DecodingError
+from eth_account import Account
+from eth_utils import keccak, to_checksum_address
+
+try:
+    from websockets.exceptions import WebSocketException
+    from websockets.sync.client import connect as ws_connect
+    _WEBSOCKET_ERRORS: Tuple[type, ...] = (WebSocketException,)
+except ImportError:  # only needed when a WebSocket RPC URL is configured
+    ws_connect = None
+    _WEBSOCKET_ERRORS = ()
 
 logger = logging.getLogger(__name__)
 
-class CastInteractor:
-    """Wrapper class for interacting with contracts using cast"""
+# CampaignData struct as returned by getCampaign() / getCampaignDetails()
+CAMPAIGN_DATA_TYPE = "(address,string,string,uint256,uint256,uint256,uint256,uint256,address,uint8,uint256)"
+CAMPAIGN_DATA_FIELDS = (
+    "creator", "name", "metadataURI", "fundingGoal", "deadline", "totalRaised",
+    "creatorReservePercentage", "liquidityPercentage", "tokenAddress", "state", "createdAt",
+)
+
+
+# Node error messages meaning the locally tracked nonce is stale; re-sync and sign again
+NONCE_ERRORS = ("nonce too low", "replacement transaction underpriced")
+# Rejections meaning the node already holds this exact signed transaction, i.e. it was sent
+ALREADY_KNOWN_ERRORS = ("already known", "known transaction")
+
+
+class RpcError(Exception):
+    """Raised when the RPC endpoint answers with a JSON-RPC error"""
+
+
+class BroadcastUnconfirmed(Exception):
+    """Raised when eth_sendRawTransaction failed in transit, so the node may still have the transaction"""
+    
+    def __init__(self, tx_hash: str, cause: Exception):
+        super().__init__(f"Broadcast of {tx_hash} unconfirmed: {cause}")
+        self.tx_hash = tx_hash
+
+
+# Ways a NewHeadsSubscription can fail: connection and protocol errors, timeouts (OSError),
+# a missing websockets package (RuntimeError), node errors and malformed messages or results
+SUBSCRIPTION_ERRORS: Tuple[type, ...] = (
+    OSError, RuntimeError, RpcError, ValueError, KeyError, DecodingError, *_WEBSOCKET_ERRORS,
+)
+
+
+# Function signatures called by the test suite
+BALANCE_OF_SIG = "balanceOf(address)"
+ALLOWANCE_SIG = "allowance(address,address)"
+APPROVE_SIG = "approve(address,uint256)"
+CONTRIBUTE_SIG = "contribute(uint256)"
+CONTRIBUTE_WITH_PERMIT_SIG = "contributeWithPermit(uint256,uint256,uint8,bytes32,bytes32)"
+NONCES_SIG = "nonces(address)"
+EIP712_DOMAIN_SIG = "eip712Domain()"
+CREATE_CAMPAIGN_SIG = "createCampaign(string,string,uint256,uint256,uint256,uint256,string,string)"
+GET_CAMPAIGN_COUNT_SIG = "getCampaignCount()"
+GET_CAMPAIGN_ADDRESS_SIG = "getCampaignAddress(uint256)"
+GET_CAMPAIGN_SIG = "getCampaign(uint256)"
+GET_CAMPAIGN_DETAILS_SIG = "getCampaignDetails()"
+UPDATE_CAMPAIGN_STATE_SIG = "updateCampaignState()"
+CLAIM_TOKENS_SIG = "claimTokens()"
+WITHDRAW_FUNDS_SIG = "withdrawFunds()"
+REFUND_SIG = "refund()"
+CREATE_LIQUIDITY_POOL_SIG = "createLiquidityPool()"
+AGGREGATE3_SIG = "aggregate3((address,bool,bytes)[])"
+# Permit2's allowance(owner, token, spender) -> (amount, expiration, nonce)
+PERMIT2_ALLOWANCE_SIG = "allowance(address,address,address)"
+
+SIGNATURES = (
+    BALANCE_OF_SIG,
+    ALLOWANCE_SIG,
+    APPROVE_SIG,
+    CONTRIBUTE_SIG,
+    CONTRIBUTE_WITH_PERMIT_SIG,
+    NONCES_SIG,
+    EIP712_DOMAIN_SIG,
+    CREATE_CAMPAIGN_SIG,
+    GET_CAMPAIGN_COUNT_SIG,
+    GET_CAMPAIGN_ADDRESS_SIG,
+    GET_CAMPAIGN_SIG,
+    GET_CAMPAIGN_DETAILS_SIG,
+    UPDATE_CAMPAIGN_STATE_SIG,
+    CLAIM_TOKENS_SIG,
+    WITHDRAW_FUNDS_SIG,
+    REFUND_SIG,
+    CREATE_LIQUIDITY_POOL_SIG,
+    AGGREGATE3_SIG,
+    PERMIT2_ALLOWANCE_SIG,
+)
+
+# Canonical Multicall3 deployment (same address on Sepolia and most other chains)
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+
+def _types_for(signature: str) -> List[str]:
+    """Get the ABI argument types of a function signature (tuple types are kept whole)"""
+    params = signature[signature.index("(") + 1:-1]
+    types, depth, start = [], 0, 0
+    for i, char in enumerate(params):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            types.append(params[start:i])
+            start = i + 1
+    if params:
+        types.append(params[start:])
+    return types
+
+
+# Selectors and argument encoders are computed once instead of on every call
+SELECTORS: Dict[str, bytes] = {sig: keccak(text=sig)[:4] for sig in SIGNATURES}
+ENCODERS: Dict[str, Callable[[list], bytes]] = {sig: functools.partial(encode, _types_for(sig)) for sig in SIGNATURES}
+
+
+def encode_call(signature: str, *args) -> str:
+    """ABI-encode a call to a function like "approve(address,uint256)" as hex calldata"""
+    selector = SELECTORS.get(signature)
+    if selector is None:
+        # Signatures outside SIGNATURES are compiled on first use and kept
+        selector = SELECTORS[signature] = keccak(text=signature)[:4]
+        ENCODERS[signature] = functools.partial(encode, _types_for(signature))
+    return "0x" + (selector + ENCODERS[signature](list(args))).hex()
+
+
+def _caller_location() -> str:
+    """Return "file:line" of the first caller outside this module (the code that wanted cast run)"""
+    frame = inspect.currentframe().f_back
+    while frame.f_back is not None and frame.f_globals.get("__name__") == __name__:
+        frame = frame.f_back
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno}"
+
+
+# EIP-2612 Permit struct, signed off-chain and submitted through contributeWithPermit
+PERMIT_TYPES = {
+    "Permit": [
+        {"name": "owner", "type": "address"},
+        {"name": "spender", "type": "address"},
+        {"name": "value", "type": "uint256"},
+        {"name": "nonce", "type": "uint256"},
+        {"name": "deadline", "type": "uint256"},
+    ],
+}
+
+
+def sign_permit(private_key: str, domain: dict, owner: str, spender: str, value: int, nonce: int, deadline: int):
+    """Sign an EIP-2612 permit for the token described by the EIP-712 domain"""
+    # LocalAccount has no sign_typed_data in the pinned eth-account, only the Account class does
+    return Account.sign_typed_data(
+        private_key,
+        domain_data=domain,
+        message_types=PERMIT_TYPES,
+        message_data={"owner": owner, "spender": spender, "value": value, "nonce": nonce, "deadline": deadline},
+    )
+
+
+def eth_call_request(to: str, data: str) -> dict:
+    """Build an eth_call request entry for RpcClient.rpc_batch"""
+    return {"method": "eth_call", "params": [{"to": to, "data": data}, "latest"]}
+
+
+def decode_campaign_data(raw: str) -> dict:
+    """Decode a raw CampaignData return value into a dict keyed by struct field name"""
+    values = decode([CAMPAIGN_DATA_TYPE], bytes.fromhex(raw[2:]))[0]
+    return dict(zip(CAMPAIGN_DATA_FIELDS, values))
+
+
+class NewHeadsSubscription:
+    """eth_subscribe("newHeads") over a WebSocket, with eth_call served on the same socket"""
+    
+    def __init__(self, ws_url: str):
+        if ws_connect is None:
+            raise RuntimeError("The websockets package is required for WebSocket RPC URLs")
+        self._ws = ws_connect(ws_url)
+        self._request_ids = itertools.count(1)
+        # Heads pushed while waiting for the response to a request
+        self._heads: Deque[dict] = deque()
+        self._subscription_id = self._request("eth_subscribe", ["newHeads"])
+    
+    def _receive(self, timeout: float) -> dict:
+        """Read the next message, queueing it if it is a subscription push"""
+        message = json.loads(self._ws.recv(timeout=timeout))
+        if message.get("method") == "eth_subscription":
+            self._heads.append(message["params"]["result"])
+        return message
+    
+    def _request(self, method: str, params: list, timeout: float = 60) -> Any:
+        """Send a JSON-RPC request on the socket and wait for its response"""
+        request_id = next(self._request_ids)
+        self._ws.send(json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}))
+        while True:
+            message = self._receive(timeout)
+            if message.get("id") == request_id:
+                if "error" in message:
+                    raise RpcError(message["error"].get("message", str(message["error"])))
+                return message["result"]
     
-    def __init__(self, rpc_url: str, private_key: str):
+    def next_head(self, timeout: float = 60) -> dict:
+        """Block until the next block header is pushed and return it"""
+        while not self._heads:
+            self._receive(timeout)
+        return self._heads.popleft()
+    
+    def eth_call(self, to: str, data: str) -> str:
+        """Execute a read-only call over the subscription socket"""
+        return self._request("eth_call", [{"to": to, "data": data}, "latest"])
+    
+    def close(self):
+        """Cancel the subscription and close the socket"""
+        try:
+            self._request("eth_unsubscribe", [self._subscription_id], timeout=5)
+        except (RpcError, TimeoutError):
+            pass
+        self._ws.close()
+    
+    def __enter__(self) -> "NewHeadsSubscription":
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RpcClient:
+    """JSON-RPC transport and read-only calls for one endpoint, with cast as fallback
+    
+    A client holds no keys, so several Signers can share one instance (and its connection pool).
+    """
+    
+    # How long a fetched gas price is reused before asking the node again (seconds)
+    GAS_PRICE_TTL = 5
+    # Most keep-alive connections held open to the endpoint (parallel scenarios + batch workers)
+    POOL_MAXSIZE = 16
+    
+    def __init__(self, rpc_url: str):
         self.rpc_url = rpc_url
-        self.private_key = private_key
+        # Keep-alive session so every call reuses the same TCP/TLS connection. A client only talks
+        # to one host, and pool_block makes bursts wait for a warm connection rather than opening
+        # (and then discarding) extra ones that each pay a fresh TLS handshake
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.POOL_MAXSIZE, pool_block=True)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        # Bodies are serialized with orjson, so the JSON content type is set once here
+        self._session.headers["Content-Type"] = "application/json"
+        self._request_ids = itertools.count(1)
+        self._chain_id: Optional[int] = None
+        self._gas_price: Optional[int] = None
+        self._gas_price_fetched_at = 0.0
+        # Campaign addresses never change once deployed, keyed by (factory, campaign_id)
+        self._campaign_addresses: Dict[Tuple[str, int], str] = {}
+        # EIP-712 domains of permit-capable tokens (None if the token has no permit support)
+        self._permit_domains: Dict[str, Optional[dict]] = {}
+        # Whether each campaign's bytecode has contributeWithPermit (older deployments do not)
+        self._permit_campaigns: Dict[str, bool] = {}
+    
+    def request(self, method: str, params: list) -> Any:
+        """Send a JSON-RPC request over the persistent session and return its result"""
+        payload = {"jsonrpc": "2.0", "id": next(self._request_ids), "method": method, "params": params}
+        response = self._session.post(self.rpc_url, data=orjson.dumps(payload), timeout=60)
+        response.raise_for_status()
+        try:
+            body = orjson.loads(response.content)
+        except orjson.JSONDecodeError as e:
+            # A proxy or overloaded node answering with HTML is a transport failure, not an RPC error
+            raise requests.exceptions.InvalidJSONError(f"Invalid JSON-RPC response: {e}", response=response) from e
+        if not isinstance(body, dict):
+            raise requests.exceptions.InvalidJSONError("JSON-RPC response is not an object", response=response)
         
-    def run_cast_command(self, command: list, decode_output: bool = True) -> Optional[str]:
-        """Execute a cast command and return the result"""
-        import inspect
-        frame = inspect.currentframe()
-        caller_frame = frame.f_back
-        filename = caller_frame.f_code.co_filename.split('/')[-1]
-        line_number = caller_frame.f_lineno
+        if "error" in body:
+            raise RpcError(body["error"].get("message", str(body["error"])))
+        return body["result"]
+    
+    def rpc_batch(self, calls: List[dict]) -> List[Any]:
+        """Send several JSON-RPC requests in one HTTP POST; failed entries come back as None"""
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": call["method"], "params": call["params"]}
+            for i, call in enumerate(calls)
+        ]
+        try:
+            response = self._session.post(self.rpc_url, data=orjson.dumps(payload), timeout=60)
+            response.raise_for_status()
+            body = orjson.loads(response.content)
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
+            logger.warning(f"RPC session unavailable ({e}), falling back to cast")
+            return self._cast_batch_fallback(calls)
+        
+        if not isinstance(body, list):
+            # Some nodes reject a whole batch with a single error object instead of per-entry errors
+            error = body.get("error") if isinstance(body, dict) else body
+            logger.warning(f"Batch request rejected ({error}), falling back to cast")
+            return self._cast_batch_fallback(calls)
         
+        # Responses to a batch may arrive in any order
+        results: List[Any] = [None] * len(calls)
+        for item in body:
+            index = item.get("id") if isinstance(item, dict) else None
+            if not isinstance(index, int) or not 0 <= index < len(calls):
+                logger.error(f"Ignoring batch response with unknown id: {item}")
+            elif "error" in item:
+                logger.error(f"Batched {calls[index]['method']} failed: {item['error'].get('message')}")
+            else:
+                results[index] = item.get("result")
+        return results
+    
+    def _cast_batch_fallback(self, calls: List[dict]) -> List[Any]:
+        """Answer a batch through cast; only eth_call entries have an equivalent, the rest are None"""
+        call_indexes = [i for i, call in enumerate(calls) if call["method"] == "eth_call"]
+        outputs = self.run_cast_commands_batch([
+            ["call", calls[i]["params"][0]["to"], calls[i]["params"][0]["data"]] for i in call_indexes
+        ])
+        fallback: List[Any] = [None] * len(calls)
+        for i, output in zip(call_indexes, outputs):
+            fallback[i] = output
+        return fallback
+    
+    def get_chain_id(self) -> int:
+        """Get the chain ID (fetched once per client)"""
+        if self._chain_id is None:
+            self._chain_id = int(self.request("eth_chainId", []), 16)
+        return self._chain_id
+    
+    def get_gas_price(self) -> int:
+        """Get the current gas price, reusing it for GAS_PRICE_TTL seconds"""
+        now = time.monotonic()
+        if self._gas_price is None or now - self._gas_price_fetched_at > self.GAS_PRICE_TTL:
+            self._gas_price = int(self.request("eth_gasPrice", []), 16)
+            self._gas_price_fetched_at = now
+        return self._gas_price
+    
+    def wait_for_receipt(self, tx_hash: str, timeout: int = 120) -> dict:
+        """Poll for a transaction receipt, returning as soon as the transaction is mined"""
+        deadline = time.time() + timeout
+        interval = 0.5
+        while True:
+            try:
+                receipt = self.request("eth_getTransactionReceipt", [tx_hash])
+            except requests.RequestException as e:
+                # The transaction is already out; a transport hiccup only costs this poll
+                logger.debug("Receipt poll for %s failed: %s", tx_hash, e)
+                receipt = None
+            if receipt is not None:
+                if receipt.get("status") == "0x0":
+                    raise RpcError(f"Transaction {tx_hash} reverted")
+                return receipt
+            if time.time() + interval > deadline:
+                raise TimeoutError(f"Timed out waiting for transaction {tx_hash}")
+            time.sleep(interval)
+            interval = min(interval * 2, 2.0)
+    
+    def eth_call(self, to: str, data: str, state_override: Optional[dict] = None) -> Optional[str]:
+        """Execute a read-only call and return the raw hex result (optionally with a state override set)"""
+        params = [{"to": to, "data": data}, "latest"]
+        if state_override is not None:
+            params.append(state_override)
+        try:
+            return self.request("eth_call", params)
+        except RpcError as e:
+            logger.error(f"eth_call to {to} failed: {e}")
+            return None
+        except requests.RequestException as e:
+            if state_override is not None:
+                logger.warning(f"RPC session unavailable ({e}) for a call with state overrides")
+                return None
+            logger.warning(f"RPC session unavailable ({e}), falling back to cast")
+            return self.run_cast_command(["call", to, data])
+    
+    def multicall3(self, calls: List[Tuple[str, str]]) -> List[Optional[str]]:
+        """Run several (to, calldata) reads in one eth_call via Multicall3; failed calls come back as None"""
+        data = encode_call(AGGREGATE3_SIG, [(to, True, bytes.fromhex(calldata[2:])) for to, calldata in calls])
+        result = self.eth_call(MULTICALL3_ADDRESS, data)
+        if not result:
+            return [None] * len(calls)
+        
+        returns = decode(["(bool,bytes)[]"], bytes.fromhex(result[2:]))[0]
+        return ["0x" + return_data.hex() if success else None for success, return_data in returns]
+    
+    def warp_to(self, timestamp: int) -> bool:
+        """Mine a block at the given timestamp (local anvil nodes only)"""
+        try:
+            self.request("evm_setNextBlockTimestamp", [timestamp])
+            self.request("evm_mine", [])
+            return True
+        except (RpcError, requests.RequestException) as e:
+            logger.error(f"Failed to advance chain time: {e}")
+            return False
+    
+    def get_transaction_receipt(self, tx_hash: str) -> Optional[dict]:
+        """Get the receipt of a mined transaction"""
+        try:
+            return self.request("eth_getTransactionReceipt", [tx_hash])
+        except (RpcError, requests.RequestException) as e:
+            logger.error(f"Failed to get receipt for {tx_hash}: {e}")
+            return None
+        
+    def get_code(self, address: str) -> Optional[str]:
+        """Get the runtime bytecode at an address ("0x" if nothing is deployed there)"""
+        try:
+            return self.request("eth_getCode", [address, "latest"])
+        except RpcError as e:
+            logger.error(f"eth_getCode for {address} failed: {e}")
+            return None
+        except requests.RequestException as e:
+            logger.warning(f"RPC session unavailable ({e}), falling back to cast")
+            return self.run_cast_command(["code", address])
+    
+    def run_cast_command(self, command: list, private_key: Optional[str] = None) -> Optional[str]:
+        """Execute a cast command and return the result (private_key signs "send" commands)"""
         full_command = ["cast"] + command + ["--rpc-url", self.rpc_url]
         
         # Add private key for transactions
-        if any(cmd in command for cmd in ["send", "call"]):
-            if "send" in command:
-                full_command.extend(["--private-key", self.private_key])
+        if "send" in command and private_key:
+            full_command.extend(["--private-key", private_key])
         
         try:
-            logger.debug(f"[{filename}:{line_number}] Executing: {' '.join(full_command[:3])} ...")  # Don't log private key
-            result = subprocess.run(full_command, capture_output=True, text=True, timeout=60)
+            # Only walk the stack for the caller's location when it will actually be logged
+            debug = logger.isEnabledFor(logging.DEBUG)
+            if debug:
+                logger.debug("[%s] Executing: %s ...", _caller_location(), " ".join(full_command[:3]))  # Don't log private key
+            # Raw bytes: cast prints hex/ASCII, so decode once here rather than via a text wrapper
+            result = subprocess.run(full_command, capture_output=True, timeout=60)
             
             if result.returncode != 0:
-                logger.error(f"[{filename}:{line_number}] Cast command failed: {result.stderr}")
+                logger.error("[%s] Cast command failed: %s", _caller_location(), result.stderr.decode("utf-8", "replace"))
                 return None
                 
-            output = result.stdout.strip()
-            logger.debug(f"[{filename}:{line_number}] Cast result: {output}")
+            output = result.stdout.decode("ascii", "replace").strip() if result.stdout else ""
+            if debug:
+                logger.debug("[%s] Cast result: %s", _caller_location(), output)
             return output
             
         except subprocess.TimeoutExpired:
-            logger.error(f"[{filename}:{line_number}] Cast command timed out")
+            logger.error("[%s] Cast command timed out", _caller_location())
             return None
         except Exception as e:
-            logger.error(f"[{filename}:{line_number}] Error executing cast command: {e}")
+            logger.error("[%s] Error executing cast command: %s", _caller_location(), e)
             return None
     
+    def run_cast_commands_batch(self, commands: List[list], max_workers: int = 4) -> List[Optional[str]]:
+        """Run several cast commands concurrently so process start-up and network waits overlap"""
+        if not commands:
+            return []
+        with ThreadPoolExecutor(max_workers=min(len(commands), max_workers)) as executor:
+            return list(executor.map(self.run_cast_command, commands))
+    
+    def get_permit_domain(self, token_address: str) -> Optional[dict]:
+        """Get the token's EIP-712 domain via ERC-5267 eip712Domain(), or None without permit support"""
+        key = token_address.lower()
+        if key not in self._permit_domains:
+            try:
+                result = self.request("eth_call", [{"to": token_address, "data": encode_call(EIP712_DOMAIN_SIG)}, "latest"])
+            except RpcError:
+                result = None  # reverted: the token does not implement ERC-5267
+            except requests.RequestException:
+                return None
+            domain = None
+            if result and len(result) > 2:
+                _, name, version, chain_id, verifying_contract, _, _ = decode(
+                    ["bytes1", "string", "string", "uint256", "address", "bytes32", "uint256[]"],
+                    bytes.fromhex(result[2:]),
+                )
+                domain = {"name": name, "version": version, "chainId": chain_id, "verifyingContract": verifying_contract}
+            self._permit_domains[key] = domain
+        return self._permit_domains[key]
+    
+    def campaign_supports_permit(self, campaign_address: str) -> bool:
+        """Whether the campaign's runtime bytecode dispatches contributeWithPermit (cached per campaign)"""
+        key = campaign_address.lower()
+        if key not in self._permit_campaigns:
+            code = self.get_code(campaign_address)
+            if not code:
+                return False
+            # The dispatcher compares calldata against each selector it implements
+            self._permit_campaigns[key] = SELECTORS[CONTRIBUTE_WITH_PERMIT_SIG].hex() in code.lower()
+        return self._permit_campaigns[key]
+    
+    def estimate_gas(self, sender: str, to: str, data: str) -> int:
+        """Estimate the gas of a call from sender (raises RpcError if the call would revert)"""
+        return int(self.request("eth_estimateGas", [{"from": sender, "to": to, "data": data}]), 16)
+    
+    def get_campaign_address(self, factory_address: str, campaign_id: int) -> Optional[str]:
+        """Get campaign contract address (cached after the first successful lookup)"""
+        key = (factory_address.lower(), campaign_id)
+        if key in self._campaign_addresses:
+            return self._campaign_addresses[key]
+        
+        result = self.eth_call(factory_address, encode_call(GET_CAMPAIGN_ADDRESS_SIG, campaign_id))
+        return self.remember_campaign_address(factory_address, campaign_id, result) if result else None
+        
+    def remember_campaign_address(self, factory_address: str, campaign_id: int, raw_result: str) -> Optional[str]:
+        """Decode a raw getCampaignAddress() result fetched elsewhere (e.g. in a batch) and cache it"""
+        # Anything short of a full word (e.g. "0x" from an address without code) is not an answer
+        if not raw_result.startswith("0x") or len(raw_result) < 2 + 64:
+            logger.error(f"Unexpected getCampaignAddress() result: {raw_result!r}")
+            return None
+        # The address sits in the low 20 bytes of the returned 32-byte word
+        address = to_checksum_address(bytes.fromhex(raw_result[2:66])[-20:])
+        self._campaign_addresses[(factory_address.lower(), campaign_id)] = address
+        return address
+
+
+class Signer:
+    """Signs and submits transactions for one account, tracking its nonce locally"""
+    
+    def __init__(self, private_key: str, client: RpcClient):
+        self.private_key = private_key
+        self.client = client
+        # The address is a pure function of the key, so derive it once in-process
+        self.account = Account.from_key(private_key)
+        # Serializes nonce use + broadcast when several threads send from this account
+        self._send_lock = threading.Lock()
+        # Next nonce for this account, fetched once and then tracked locally
+        self._nonce: Optional[int] = None
+        # Held from reading a token's permit nonce until the permit is mined: concurrent permits
+        # from one owner would otherwise all sign the same nonce and all but the first would fail
+        self.permit_lock = threading.Lock()
+    
+    @property
+    def address(self) -> str:
+        """Checksummed address of the signing account"""
+        return self.account.address
+    
+    def _broadcast(self, to: str, data: str) -> str:
+        """Sign a transaction with the locally tracked nonce and submit it, returning its hash"""
+        account, client = self.account, self.client
+        with self._send_lock:
+            for attempt in range(2):
+                if self._nonce is None:
+                    self._nonce = int(client.request("eth_getTransactionCount", [account.address, "pending"]), 16)
+                
+                tx = {
+                    "to": to,
+                    "data": data,
+                    "value": 0,
+                    "nonce": self._nonce,
+                    "gasPrice": client.get_gas_price(),
+                    "chainId": client.get_chain_id(),
+                }
+                tx["gas"] = client.estimate_gas(account.address, to, data)
+                
+                signed = account.sign_transaction(tx)
+                try:
+                    tx_hash = client.request("eth_sendRawTransaction", ["0x" + bytes(signed.raw_transaction).hex()])
+                except requests.RequestException as e:
+                    # The node may or may not have accepted it; re-sync the nonce on the next send
+                    self._nonce = None
+                    raise BroadcastUnconfirmed("0x" + bytes(signed.hash).hex(), e) from e
+                except RpcError as e:
+                    if any(msg in str(e).lower() for msg in ALREADY_KNOWN_ERRORS):
+                        logger.debug("Transaction already known to the node: %s", e)
+                        tx_hash = "0x" + bytes(signed.hash).hex()
+                        self._nonce += 1
+                        return tx_hash
+                    if attempt == 0 and any(msg in str(e).lower() for msg in NONCE_ERRORS):
+                        logger.warning(f"Nonce {self._nonce} rejected ({e}), re-syncing with the node")
+                        self._nonce = None
+                        continue
+                    raise
+                
+                self._nonce += 1
+                return tx_hash
+    
+    def send_transaction(self, to: str, data: str) -> Optional[str]:
+        """Sign a transaction in-process, broadcast it and wait for it to be mined"""
+        try:
+            tx_hash = self._broadcast(to, data)
+            logger.debug("Transaction sent: %s", tx_hash)
+        except RpcError as e:
+            logger.error(f"Transaction to {to} failed: {e}")
+            return None
+        except BroadcastUnconfirmed as e:
+            # Never re-submit: the same call could land twice. Watch for the signed hash instead
+            logger.warning(f"{e}; waiting for it to be mined")
+            tx_hash = e.tx_hash
+        except requests.RequestException as e:
+            # Failed before eth_sendRawTransaction, so nothing was broadcast and cast can send it
+            logger.warning(f"RPC session unavailable ({e}), falling back to cast")
+            # cast picks its own nonce, so ours must be re-fetched afterwards
+            self._nonce = None
+            # cast send waits for the receipt itself; --json exposes the transaction hash
+            output = self.client.run_cast_command(["send", to, data, "--json"], self.private_key)
+            return json.loads(output)["transactionHash"] if output else None
+        
+        try:
+            self.client.wait_for_receipt(tx_hash)
+            return tx_hash
+        except (RpcError, TimeoutError) as e:
+            logger.error(f"Transaction to {to} failed: {e}")
+            return None
+
+
+class CastInteractor:
+    """Contract interactions for one account: a Signer on top of a (possibly shared) RpcClient"""
+    
+    def __init__(self, rpc_url: str, private_key: str, client: Optional[RpcClient] = None):
+        self.rpc_url = rpc_url
+        self.private_key = private_key
+        # Pass a shared client so several accounts use one session and connection pool
+        self.client = client if client is not None else RpcClient(rpc_url)
+        self.signer = Signer(private_key, self.client)
+    
+    def rpc_batch(self, calls: List[dict]) -> List[Any]:
+        """Send several JSON-RPC requests in one HTTP POST; failed entries come back as None"""
+        return self.client.rpc_batch(calls)
+    
+    def wait_for_receipt(self, tx_hash: str, timeout: int = 120) -> dict:
+        """Poll for a transaction receipt, returning as soon as the transaction is mined"""
+        return self.client.wait_for_receipt(tx_hash, timeout)
+    
+    def eth_call(self, to: str, data: str, state_override: Optional[dict] = None) -> Optional[str]:
+        """Execute a read-only call and return the raw hex result (optionally with a state override set)"""
+        return self.client.eth_call(to, data, state_override)
+    
+    def multicall3(self, calls: List[Tuple[str, str]]) -> List[Optional[str]]:
+        """Run several (to, calldata) reads in one eth_call via Multicall3; failed calls come back as None"""
+        return self.client.multicall3(calls)
+    
+    def send_transaction(self, to: str, data: str) -> Optional[str]:
+        """Sign a transaction with this account, broadcast it and wait for it to be mined"""
+        return self.signer.send_transaction(to, data)
+    
+    def warp_to(self, timestamp: int) -> bool:
+        """Mine a block at the given timestamp (local anvil nodes only)"""
+        return self.client.warp_to(timestamp)
+    
+    def get_transaction_receipt(self, tx_hash: str) -> Optional[dict]:
+        """Get the receipt of a mined transaction"""
+        return self.client.get_transaction_receipt(tx_hash)
+    
+    def get_code(self, address: str) -> Optional[str]:
+        """Get the runtime bytecode at an address ("0x" if nothing is deployed there)"""
+        return self.client.get_code(address)
+    
+    def run_cast_command(self, command: list, decode_output: bool = True) -> Optional[str]:
+        """Execute a cast command and return the result ("send" commands are signed by this account)"""
+        return self.client.run_cast_command(command, self.private_key)
+    
+    def run_cast_commands_batch(self, commands: List[list], max_workers: int = 4) -> List[Optional[str]]:
+        """Run several cast commands concurrently so process start-up and network waits overlap"""
+        return self.client.run_cast_commands_batch(commands, max_workers)
+    
     def get_balance(self, token_address: str, account: str) -> int:
         """Get ERC20 token balance"""
-        result = self.run_cast_command([
-            "call", token_address, 
-            "balanceOf(address)(uint256)", account
-        ])
+        result = self.eth_call(token_address, encode_call(BALANCE_OF_SIG, account))
         return int(result, 16) if result else 0
     
     def approve_token(self, token_address: str, spender: str, amount: int) -> bool:
         """Approve token spending"""
-        result = self.run_cast_command([
-            "send", token_address,
-            "approve(address,uint256)", spender, str(amount),
-        ])
+        result = self.send_transaction(token_address, encode_call(APPROVE_SIG, spender, amount))
+        return result is not None
+    
+    def contribute(self, campaign_address: str, amount: int) -> bool:
+        """Contribute USDC to a campaign (allowance must already be approved)"""
+        result = self.send_transaction(campaign_address, encode_call(CONTRIBUTE_SIG, amount))
+        return result is not None
+    
+    def contribute_with_permit(self, token_address: str, campaign_address: str, amount: int,
+                               valid_for: int = 600) -> Optional[bool]:
+        """Contribute in a single transaction using an EIP-2612 permit instead of a separate approve
+        
+        Returns None when nothing was sent (no permit support, or the call would revert), so the
+        caller can fall back to approve + contribute; False means the transaction itself failed.
+        """
+        domain = self.client.get_permit_domain(token_address)
+        if domain is None:
+            logger.debug(f"Token {token_address} does not support permit")
+            return None
+        if not self.client.campaign_supports_permit(campaign_address):
+            logger.debug(f"Campaign {campaign_address} has no contributeWithPermit")
+            return None
+        
+        with self.signer.permit_lock:
+            return self._contribute_with_permit(token_address, campaign_address, amount, domain, valid_for)
+    
+    def _contribute_with_permit(self, token_address: str, campaign_address: str, amount: int,
+                                domain: dict, valid_for: int) -> Optional[bool]:
+        """Sign and send contributeWithPermit (caller holds the signer's permit lock)"""
+        account = self.signer.account
+        nonce_result = self.eth_call(token_address, encode_call(NONCES_SIG, account.address))
+        if not nonce_result:
+            return None
+        
+        deadline = int(time.time()) + valid_for
+        signed = sign_permit(
+            self.private_key, domain, account.address, campaign_address, amount, int(nonce_result, 16), deadline
+        )
+        data = encode_call(
+            CONTRIBUTE_WITH_PERMIT_SIG,
+            amount, deadline, signed.v, signed.r.to_bytes(32, "big"), signed.s.to_bytes(32, "big"),
+        )
+        # Only a call that simulates cleanly is sent; once broadcast, a failure must not fall back
+        try:
+            self.client.estimate_gas(account.address, campaign_address, data)
+        except (RpcError, requests.RequestException) as e:
+            logger.warning(f"contributeWithPermit would not succeed ({e}), not sending it")
+            return None
+        result = self.send_transaction(campaign_address, data)
         return result is not None
     
     def get_campaign_details(self, factory_address: str, campaign_id: int) -> Optional[dict]:
         """Get campaign details from factory"""
-        result = self.run_cast_command([
-            "call", factory_address,
-            "getCampaign(uint256)", str(campaign_id)
-        ])
+        result = self.eth_call(factory_address, encode_call(GET_CAMPAIGN_SIG, campaign_id))
         
         if not result:
             return None
             
         try:
-            # Parse the tuple result
-            # This is a simplified parser - in production you'd want more robust parsing
-            return {"raw": result}
+            return decode_campaign_data(result)
         except Exception as e:
             logger.error(f"Error parsing campaign details: {e}")
             return None
     
     def get_campaign_address(self, factory_address: str, campaign_id: int) -> Optional[str]:
-        """Get campaign contract address"""
-        result = self.run_cast_command([
-            "call", factory_address,
-            "getCampaignAddress(uint256)", str(campaign_id)
-        ])
-        
-        if result and result.startswith("0x"):
-            # Ensure address is properly formatted (42 chars total: 0x + 40 hex chars)
-            hex_part = result[2:]  # Remove 0x prefix
-            if len(hex_part) > 40:
-                # If longer than 40 chars, take the last 40 chars (remove leading zeros from padding)
-                hex_part = hex_part[-40:]
-            elif len(hex_part) < 40:
-                # If shorter than 40 chars, pad with leading zeros
-                hex_part = hex_part.zfill(40)
-            return f"0x{hex_part}"
-        return result
-    
-    def get_account_address(self) -> Optional[str]:
+        """Get campaign contract address (cached after the first successful lookup)"""
+        return self.client.get_campaign_address(factory_address, campaign_id)
+    
+    def get_account_address(self) -> str:
         """Get account address from private key"""
-        # wallet address command doesn't need --rpc-url
-        full_command = ["cast", "wallet", "address", self.private_key]
-        
-        try:
-            logger.debug("Executing: cast wallet address ...")  # Don't log private key
-            result = subprocess.run(full_command, capture_output=True, text=True, timeout=30)
-            
-            if result.returncode != 0:
-                logger.error(f"Cast wallet command failed: {result.stderr}")
-                return None
-                
-            output = result.stdout.strip()
-            logger.debug(f"Account address: {output}")
-            return output
-            
-        except subprocess.TimeoutExpired:
-            logger.error("Cast wallet command timed out")
-            return None
-        except Exception as e:
-            logger.error(f"Error executing cast wallet command: {e}")
-            return None
\ No newline at end of file
+        return self.signer.address
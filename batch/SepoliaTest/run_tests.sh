@@ -77,7 +77,7 @@ print_info "Cast version: $(cast --version)"
 # Install dependencies if requirements.txt exists and packages aren't installed
 if [ -f "requirements.txt" ]; then
     print_info "Checking Python dependencies..."
-    if ! $PYTHON_CMD -c "import dotenv" &> /dev/null; then
+    if ! $PYTHON_CMD -c "import dotenv, requests, eth_abi, eth_account, orjson" &> /dev/null; then
         print_info "Installing Python dependencies with uv..."
         uv pip install -r requirements.txt
     fi
@@ -172,11 +172,11 @@ fi
 # Run the tests
 print_header "Running Integration Tests"
 print_info "This will create test campaigns with 2-minute durations"
-print_info "Total test time: approximately 10-15 minutes"
+print_info "Total test time: approximately 3-5 minutes (scenarios run in parallel)"
 print_info ""
 
 # Run the Python test suite
-if $PYTHON_CMD sepolia_test.py; then
+if $PYTHON_CMD sepolia_test.py "$@"; then
     print_header "All tests completed successfully! ✅"
 else
     print_error "Some tests failed ❌"
@@ -14,23 +14,38 @@ Requirements:
 - Test accounts funded with Sepolia ETH and USDC
 """
 
+import argparse
 import os
 import json
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from dotenv import load_dotenv
-from cast_interactor import CastInteractor
+from eth_utils import keccak
+from anvil_fork import AnvilFork
+from cast_interactor import (
+    CastInteractor, NewHeadsSubscription, RpcClient, SUBSCRIPTION_ERRORS, decode_campaign_data, encode_call,
+    eth_call_request,
+    CREATE_CAMPAIGN_SIG, GET_CAMPAIGN_ADDRESS_SIG, GET_CAMPAIGN_SIG, GET_CAMPAIGN_DETAILS_SIG,
+    UPDATE_CAMPAIGN_STATE_SIG, CLAIM_TOKENS_SIG, WITHDRAW_FUNDS_SIG, REFUND_SIG, CREATE_LIQUIDITY_POOL_SIG,
+)
 from uniswap_helper import UniswapV2Helper
 
 # Load environment variables
 load_dotenv()
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(threadName)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# topic0 of ICampaignEvents.CampaignCreated(campaignId indexed, creator indexed, tokenAddress indexed, ...)
+CAMPAIGN_CREATED_TOPIC = "0x" + keccak(text="CampaignCreated(uint256,address,address,uint256,uint256)").hex()
+
+# Sepolia slot time in seconds; the upper bound on how long a poll waits
+BLOCK_TIME = 12
+
 @dataclass
 class ContractAddresses:
     """Contract addresses for the crowdfunding system"""
@@ -47,18 +62,36 @@ class TestConfig:
     funding_goal: int = 1000 * 10**6  # 1000 USDC (6 decimals)
     campaign_duration: int = 120  # 2 minutes for quick testing
     min_contribution: int = 1 * 10**6  # 1 USDC
+    local: bool = False  # running against a local anvil fork
+    ws_rpc_url: Optional[str] = None  # optional WebSocket endpoint for block subscriptions
+    use_permit2: bool = False  # swap via Universal Router + Permit2 instead of approve + V2 router
 
 class SepoliaTestSuite:
     """Main test suite for Sepolia crowdfunding contracts"""
     
-    def __init__(self):
+    def __init__(self, local: bool = False):
         self.config = self._load_config()
-        # Create separate cast interactors for creator and donor
-        self.creator_cast = CastInteractor(self.config.rpc_url, self.config.creator_private_key)
-        self.donor_cast = CastInteractor(self.config.rpc_url, self.config.donor_private_key)
-        # Use donor account for Uniswap interactions (they'll have the tokens)
-        self.uniswap = UniswapV2Helper(self.donor_cast)
+        self.anvil: Optional[AnvilFork] = None
+        if local:
+            # Fork the configured network locally; chain time can then be advanced at will
+            self.anvil = AnvilFork(self.config.rpc_url)
+            self.config.rpc_url = self.anvil.start()
+            self.config.local = True
+        try:
+            # Creator and donor sign with their own keys but share one RPC session
+            self.rpc = RpcClient(self.config.rpc_url)
+            self.creator_cast = CastInteractor(self.config.rpc_url, self.config.creator_private_key, self.rpc)
+            self.donor_cast = CastInteractor(self.config.rpc_url, self.config.donor_private_key, self.rpc)
+            # Use donor account for Uniswap interactions (they'll have the tokens)
+            self.uniswap = UniswapV2Helper(self.donor_cast, use_permit2=self.config.use_permit2)
+        except BaseException:
+            # The caller never gets a half-built suite to clean up, so the fork is stopped here
+            if self.anvil is not None:
+                self.anvil.stop()
+            raise
         self.test_results = []
+        # Token addresses are immutable once a campaign exists, keyed by (factory, campaign_id)
+        self._campaign_tokens: Dict[Tuple[str, int], str] = {}
         
     def _load_config(self) -> TestConfig:
         """Load configuration from environment variables"""
@@ -83,25 +116,27 @@ class SepoliaTestSuite:
             rpc_url=rpc_url, 
             creator_private_key=creator_private_key,
             donor_private_key=donor_private_key,
-            addresses=addresses
+            addresses=addresses,
+            ws_rpc_url=os.getenv("WS_RPC_URL"),
+            use_permit2=os.getenv("UNISWAP_USE_PERMIT2", "").lower() in ("1", "true", "yes"),
         )
     
     def create_campaign(self, name: str, liquidity_percentage: int) -> Optional[Tuple[int, str]]:
         """Create a new campaign and return campaign ID and address (creator account)"""
         logger.info(f"Creating campaign: {name} with {liquidity_percentage}% liquidity")
         
-        result = self.creator_cast.run_cast_command([
-            "send", self.config.addresses.factory,
-            "createCampaign(string,string,uint256,uint256,uint256,uint256,string,string)",
+        # send_transaction returns once the transaction is mined
+        result = self.creator_cast.send_transaction(self.config.addresses.factory, encode_call(
+            CREATE_CAMPAIGN_SIG,
             name,
             "ipfs://test-metadata", 
-            str(self.config.funding_goal),
-            str(self.config.campaign_duration),
-            "25",  # creator reserve (fixed at 25%)
-            str(liquidity_percentage),
+            self.config.funding_goal,
+            self.config.campaign_duration,
+            25,  # creator reserve (fixed at 25%)
+            liquidity_percentage,
             f"{name} Token",
             f"{name[:4].upper()}",
-        ])
+        ))
         
         if not result:
             logger.error("Failed to create campaign")
@@ -109,47 +144,67 @@ class SepoliaTestSuite:
             
         logger.info(f"Campaign creation transaction: {result}")
         
-        # Get the latest campaign ID (this is simplified - in production parse events)
-        time.sleep(10)  # Wait for transaction confirmation
-        
-        campaign_count_result = self.creator_cast.run_cast_command([
-            "call", self.config.addresses.factory,
-            "getCampaignCount()(uint256)"
-        ])
+        # Take the campaign ID from the CampaignCreated event: getCampaignCount() - 1 would
+        # race with campaigns created by scenarios running in parallel
+        factory = self.config.addresses.factory
+        campaign_id = self._campaign_id_from_receipt(result)
         
-        if not campaign_count_result:
-            logger.error("Failed to get campaign count")
+        if campaign_id is None:
+            logger.error("Failed to find CampaignCreated event")
             return None
-            
-        campaign_id = int(campaign_count_result, 16) - 1  # Latest campaign ID
-        campaign_address = self.creator_cast.get_campaign_address(self.config.addresses.factory, campaign_id)
         
+        # Both reads depend only on the campaign ID, so fetch them in a single round-trip
+        address_result, campaign_result = self.creator_cast.rpc_batch([
+            eth_call_request(factory, encode_call(GET_CAMPAIGN_ADDRESS_SIG, campaign_id)),
+            eth_call_request(factory, encode_call(GET_CAMPAIGN_SIG, campaign_id)),
+        ])
+        
+        campaign_address = address_result and self.rpc.remember_campaign_address(factory, campaign_id, address_result)
         if not campaign_address:
             logger.error("Failed to get campaign address")
             return None
             
         logger.info(f"Campaign created - ID: {campaign_id}, Address: {campaign_address}")
+        if campaign_result:
+            details = decode_campaign_data(campaign_result)
+            self._campaign_tokens[(factory, campaign_id)] = details["tokenAddress"]
+            logger.info(f"Campaign token: {details['tokenAddress']}, deadline: {details['deadline']}")
         return campaign_id, campaign_address
     
+    def _campaign_id_from_receipt(self, tx_hash: str) -> Optional[int]:
+        """Extract the campaign ID from the CampaignCreated event of a createCampaign transaction"""
+        receipt = self.creator_cast.get_transaction_receipt(tx_hash)
+        if not receipt:
+            return None
+        
+        factory = self.config.addresses.factory.lower()
+        for log in receipt["logs"]:
+            if log["address"].lower() == factory and log["topics"] and log["topics"][0] == CAMPAIGN_CREATED_TOPIC:
+                return int(log["topics"][1], 16)
+        return None
+    
     def contribute_to_campaign(self, campaign_address: str, amount: int) -> bool:
         """Contribute USDC to a campaign (donor account)"""
         logger.info(f"Contributing {amount / 10**6} USDC to campaign at {campaign_address}")
         
-        # First approve USDC spending (donor account)
+        # Approval and contribution in one transaction when USDC supports EIP-2612 permit
+        permit_result = self.donor_cast.contribute_with_permit(self.config.addresses.usdc, campaign_address, amount)
+        if permit_result:
+            logger.info("Contribution with permit successful")
+            return True
+        if permit_result is False:
+            # The permit transaction was sent, so approving and contributing again could pay twice
+            logger.error("Contribution with permit failed")
+            return False
+        
+        # Otherwise approve USDC spending first (donor account)
         if not self.donor_cast.approve_token(self.config.addresses.usdc, campaign_address, amount):
             logger.error("Failed to approve USDC spending")
             return False
             
-        time.sleep(5)  # Wait for approval confirmation
-        
         # Make contribution (donor account)
-        result = self.donor_cast.run_cast_command([
-            "send", campaign_address,
-            "contribute(uint256)", str(amount),
-        ])
-        
-        if result:
-            logger.info(f"Contribution successful: {result}")
+        if self.donor_cast.contribute(campaign_address, amount):
+            logger.info("Contribution successful")
             return True
         else:
             logger.error("Contribution failed")
@@ -159,29 +214,47 @@ class SepoliaTestSuite:
         """Wait for campaign to end (either succeed or fail)"""
         logger.info("Waiting for campaign to end...")
         
+        # Shared by both strategies, so polling after a failed subscription only gets the time left
         start_time = time.time()
+        if self.config.ws_rpc_url and not self.config.local:
+            ended = self._wait_for_campaign_end_ws(campaign_address, start_time + max_wait)
+            if ended is not None:
+                return ended
+        
         while time.time() - start_time < max_wait:
-            # Update campaign state first to check for deadline expiry
-            update_result = self.creator_cast.run_cast_command([
-                "send", campaign_address,
-                "updateCampaignState()"
-            ])
-            
-            if update_result:
-                logger.debug(f"Campaign state updated: {update_result}")
-                time.sleep(5)  # Wait for state update to confirm
-            
-            # Check campaign state (can use any account for read operations)
-            state_result = self.creator_cast.run_cast_command([
-                "call", campaign_address,
-                "getCampaignState()(uint8)"
+            # Read campaign details and the chain head in one request (any account can read)
+            details_result, block = self.creator_cast.rpc_batch([
+                eth_call_request(campaign_address, encode_call(GET_CAMPAIGN_DETAILS_SIG)),
+                {"method": "eth_getBlockByNumber", "params": ["latest", False]},
             ])
             
-            if state_result:
-                state = int(state_result, 16)
+            if details_result:
+                details = decode_campaign_data(details_result)
+                state = details["state"]
                 if state == 0:  # Active
-                    logger.info("Campaign still active, waiting...")
-                    time.sleep(10)
+                    remaining = details["deadline"] - int(block["timestamp"], 16) if block else None
+                    if remaining is not None and remaining < 0:
+                        # Deadline has passed on-chain; the state only changes once updated
+                        update_result = self.creator_cast.send_transaction(
+                            campaign_address, encode_call(UPDATE_CAMPAIGN_STATE_SIG)
+                        )
+                        if update_result:
+                            logger.debug(f"Campaign state updated: {update_result}")
+                            continue
+                    elif self.config.local and remaining is not None:
+                        # On a local fork, jump past the deadline instead of waiting for it
+                        logger.info(f"Local fork: advancing chain time {remaining + 1}s to pass the deadline")
+                        if self.creator_cast.warp_to(details["deadline"] + 1):
+                            continue
+                    logger.info(
+                        f"Campaign still active (raised {details['totalRaised'] / 10**6} USDC, "
+                        f"{remaining}s until deadline), waiting..."
+                    )
+                    # Sleep half the time left, at most one block, so the deadline isn't overshot
+                    if remaining is not None and remaining >= 0:
+                        time.sleep(min(BLOCK_TIME, max(1, remaining / 2)))
+                    else:
+                        time.sleep(BLOCK_TIME)
                     continue
                 elif state == 1:  # Succeeded
                     logger.info("Campaign succeeded!")
@@ -190,19 +263,43 @@ class SepoliaTestSuite:
                     logger.info("Campaign failed!")
                     return False
             
-            time.sleep(10)
+            time.sleep(BLOCK_TIME)
         
         logger.warning("Timeout waiting for campaign to end")
         return False
     
+    def _wait_for_campaign_end_ws(self, campaign_address: str, deadline: float) -> Optional[bool]:
+        """Wait for campaign to end on new-block pushes until deadline (None if the subscription is unusable)"""
+        details_call = encode_call(GET_CAMPAIGN_DETAILS_SIG)
+        try:
+            with NewHeadsSubscription(self.config.ws_rpc_url) as heads:
+                details = decode_campaign_data(heads.eth_call(campaign_address, details_call))
+                while details["state"] == 0:  # Active
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        logger.warning("Timeout waiting for campaign to end")
+                        return False
+                    
+                    head = heads.next_head(timeout=remaining)
+                    if int(head["timestamp"], 16) > details["deadline"]:
+                        # Deadline has passed on-chain; the state only changes once updated
+                        self.creator_cast.send_transaction(campaign_address, encode_call(UPDATE_CAMPAIGN_STATE_SIG))
+                    details = decode_campaign_data(heads.eth_call(campaign_address, details_call))
+        except SUBSCRIPTION_ERRORS as e:
+            logger.warning(f"Block subscription failed ({e}), falling back to polling")
+            return None
+        
+        if details["state"] == 1:  # Succeeded
+            logger.info("Campaign succeeded!")
+            return True
+        logger.info("Campaign failed!")
+        return False
+    
     def claim_tokens(self, campaign_address: str) -> bool:
         """Claim tokens from successful campaign (donor account)"""
         logger.info("Claiming tokens from campaign")
         
-        result = self.donor_cast.run_cast_command([
-            "send", campaign_address,
-            "claimTokens()", 
-        ])
+        result = self.donor_cast.send_transaction(campaign_address, encode_call(CLAIM_TOKENS_SIG))
         
         if result:
             logger.info(f"Token claim successful: {result}")
@@ -215,10 +312,7 @@ class SepoliaTestSuite:
         """Withdraw funds from successful campaign (creator only)"""
         logger.info("Withdrawing funds from campaign")
         
-        result = self.creator_cast.run_cast_command([
-            "send", campaign_address,
-            "withdrawFunds()",
-        ])
+        result = self.creator_cast.send_transaction(campaign_address, encode_call(WITHDRAW_FUNDS_SIG))
         
         if result:
             logger.info(f"Fund withdrawal successful: {result}")
@@ -231,10 +325,7 @@ class SepoliaTestSuite:
         """Create liquidity pool for successful campaign (anyone can call)"""
         logger.info("Creating liquidity pool")
         
-        result = self.creator_cast.run_cast_command([
-            "send", campaign_address,
-            "createLiquidityPool()",
-        ])
+        result = self.creator_cast.send_transaction(campaign_address, encode_call(CREATE_LIQUIDITY_POOL_SIG))
         
         if result:
             logger.info(f"Liquidity pool creation successful: {result}")
@@ -247,10 +338,7 @@ class SepoliaTestSuite:
         """Refund contribution from failed campaign (donor account)"""
         logger.info("Requesting refund from failed campaign")
         
-        result = self.donor_cast.run_cast_command([
-            "send", campaign_address,
-            "refund()",
-        ])
+        result = self.donor_cast.send_transaction(campaign_address, encode_call(REFUND_SIG))
         
         if result:
             logger.info(f"Refund successful: {result}")
@@ -261,34 +349,17 @@ class SepoliaTestSuite:
     
     def get_campaign_token_address(self, campaign_id: int) -> Optional[str]:
         """Get the token address from campaign details using factory's getCampaign method"""
-        result = self.creator_cast.run_cast_command([
-            "call", self.config.addresses.factory,
-            "getCampaign(uint256)", str(campaign_id)
-        ])
+        key = (self.config.addresses.factory, campaign_id)
+        if key in self._campaign_tokens:
+            return self._campaign_tokens[key]
         
-        if not result:
+        details = self.creator_cast.get_campaign_details(self.config.addresses.factory, campaign_id)
+        if not details:
             return None
         
-        try:
-            # Parse the CampaignData struct tuple
-            # Format: (address,string,string,uint256,uint256,uint256,uint256,uint256,address,uint8,uint256)
-            # tokenAddress is the 9th field (index 8)
-            parts = result.strip("()").split(",")
-            if len(parts) >= 9:
-                token_addr = parts[8].strip()
-                if token_addr.startswith("0x"):
-                    # Ensure proper address formatting
-                    hex_part = token_addr[2:]
-                    if len(hex_part) > 40:
-                        hex_part = hex_part[-40:]
-                    elif len(hex_part) < 40:
-                        hex_part = hex_part.zfill(40)
-                    return f"0x{hex_part}"
-                    
-            return None
-        except Exception as e:
-            logger.error(f"Error parsing token address: {e}")
-            return None
+        # tokenAddress is decoded straight from the ABI-encoded CampaignData struct
+        self._campaign_tokens[key] = details["tokenAddress"]
+        return self._campaign_tokens[key]
     
     def test_scenario_1_success_no_liquidity(self) -> bool:
         """Test Scenario 1: Success with 0% liquidity"""
@@ -361,7 +432,6 @@ class SepoliaTestSuite:
             
             # Test token swap on Uniswap
             logger.info("Testing token swap functionality...")
-            time.sleep(10)  # Wait for liquidity pool to be indexed
             
             # Get token balance to determine swap amount (donor has the tokens)
             donor_address = self.donor_cast.get_account_address()
@@ -439,12 +509,24 @@ class SepoliaTestSuite:
         logger.info(f"Creator Account: {creator_address}")
         logger.info(f"Donor Account: {donor_address}")
         
-        results = {
-            "scenario_1_success_no_liquidity": self.test_scenario_1_success_no_liquidity(),
-            "scenario_2_success_with_liquidity": self.test_scenario_2_success_with_liquidity(), 
-            "scenario_3_failure_and_refund": self.test_scenario_3_failure_and_refund()
+        scenarios = {
+            "scenario_1_success_no_liquidity": self.test_scenario_1_success_no_liquidity,
+            "scenario_2_success_with_liquidity": self.test_scenario_2_success_with_liquidity, 
+            "scenario_3_failure_and_refund": self.test_scenario_3_failure_and_refund
         }
         
+        # Scenarios use separate campaigns and spend most of their time waiting on
+        # campaign deadlines, so run them concurrently. On a local fork the deadlines are
+        # skipped by advancing chain time, which would end the other scenarios' campaigns
+        # early, so run them one at a time there.
+        completed = {}
+        max_workers = 1 if self.config.local else len(scenarios)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scenario") as executor:
+            futures = {executor.submit(test): name for name, test in scenarios.items()}
+            for future in as_completed(futures):
+                completed[futures[future]] = future.result()
+        results = {name: completed[name] for name in scenarios}
+        
         # Print summary
         logger.info("\n=== TEST RESULTS SUMMARY ===")
         for scenario, passed in results.items():
@@ -458,8 +540,16 @@ class SepoliaTestSuite:
 
 def main():
     """Main function to run the test suite"""
+    parser = argparse.ArgumentParser(description="Sepolia integration tests for the crowdfunding contracts")
+    parser.add_argument(
+        "--local", action="store_true",
+        help="run against a local anvil fork of RPC_URL, advancing chain time past campaign deadlines",
+    )
+    args = parser.parse_args()
+    
+    test_suite = None
     try:
-        test_suite = SepoliaTestSuite()
+        test_suite = SepoliaTestSuite(local=args.local)
         results = test_suite.run_all_tests()
         
         # Exit with error code if any tests failed
@@ -469,6 +559,9 @@ def main():
     except Exception as e:
         logger.error(f"Test suite failed to initialize: {e}")
         exit(1)
+    finally:
+        if test_suite is not None and test_suite.anvil is not None:
+            test_suite.anvil.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Offline check that permits are signed with the pinned eth-account (no RPC or keys needed)
+"""
+
+from eth_abi import encode
+from eth_account import Account
+from eth_utils import keccak
+from cast_interactor import sign_permit
+from uniswap_helper import UniswapV2Helper, sign_permit_single
+
+# Well-known anvil test key; never holds real funds
+PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+OWNER = Account.from_key(PRIVATE_KEY).address
+SPENDER = "0x1111111111111111111111111111111111111111"
+TOKEN = "0x2222222222222222222222222222222222222222"
+
+DOMAIN = {"name": "USD Coin", "version": "1", "chainId": 11155111, "verifyingContract": TOKEN}
+
+
+def eip2612_digest(value: int, nonce: int, deadline: int) -> bytes:
+    """The digest ERC20Permit.permit() recovers the signer from, built by hand from the EIP"""
+    domain_separator = keccak(encode(
+        ["bytes32", "bytes32", "bytes32", "uint256", "address"],
+        [
+            keccak(text="EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)"),
+            keccak(text=DOMAIN["name"]), keccak(text=DOMAIN["version"]), DOMAIN["chainId"], TOKEN,
+        ],
+    ))
+    struct_hash = keccak(encode(
+        ["bytes32", "address", "address", "uint256", "uint256", "uint256"],
+        [
+            keccak(text="Permit(address owner,address spender,uint256 value,uint256 nonce,uint256 deadline)"),
+            OWNER, SPENDER, value, nonce, deadline,
+        ],
+    ))
+    return keccak(b"\x19\x01" + domain_separator + struct_hash)
+
+
+def test_sign_permit():
+    """sign_permit signs the EIP-2612 digest with the owner's key"""
+    signed = sign_permit(PRIVATE_KEY, DOMAIN, OWNER, SPENDER, 1000 * 10**6, 3, 1_700_000_000)
+    digest = eip2612_digest(1000 * 10**6, 3, 1_700_000_000)
+    
+    assert signed.message_hash == digest
+    assert signed.signature == Account.unsafe_sign_hash(digest, PRIVATE_KEY).signature
+    assert signed.v in (27, 28)
+
+
+
+def test_sign_permit_single():
+    """sign_permit_single signs the Permit2 PermitSingle digest with the owner's key"""
+    permit2 = UniswapV2Helper.PERMIT2_ADDRESS
+    signed = sign_permit_single(PRIVATE_KEY, 11155111, permit2, TOKEN, 5 * 10**18, 2, SPENDER, 1_700_000_000)
+    
+    domain_separator = keccak(encode(
+        ["bytes32", "bytes32", "uint256", "address"],
+        [keccak(text="EIP712Domain(string name,uint256 chainId,address verifyingContract)"),
+         keccak(text="Permit2"), 11155111, permit2],
+    ))
+    details_typehash = keccak(text="PermitDetails(address token,uint160 amount,uint48 expiration,uint48 nonce)")
+    details_hash = keccak(encode(
+        ["bytes32", "address", "uint160", "uint48", "uint48"],
+        [details_typehash, TOKEN, 5 * 10**18, 1_700_000_000, 2],
+    ))
+    permit_single_typehash = keccak(
+        text="PermitSingle(PermitDetails details,address spender,uint256 sigDeadline)"
+             "PermitDetails(address token,uint160 amount,uint48 expiration,uint48 nonce)"
+    )
+    struct_hash = keccak(encode(
+        ["bytes32", "bytes32", "address", "uint256"], [permit_single_typehash, details_hash, SPENDER, 1_700_000_000]
+    ))
+    digest = keccak(b"\x19\x01" + domain_separator + struct_hash)
+    
+    assert signed.message_hash == digest
+    assert signed.signature == Account.unsafe_sign_hash(digest, PRIVATE_KEY).signature
+
+
+if __name__ == "__main__":
+    test_sign_permit()
+    test_sign_permit_single()
+    print("✅ Permit signing working correctly!")
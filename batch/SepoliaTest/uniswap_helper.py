@@ -6,204 +6,445 @@ This module provides helper functions for testing token swaps on Uniswap V2
 after a successful campaign launches its liquidity pool.
 """
 
+import json
 import logging
-from typing import Optional, Tuple
-from cast_interactor import CastInteractor
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, NamedTuple, Optional, Tuple
+from eth_abi import decode, encode
+from eth_account import Account
+from eth_utils import keccak, to_checksum_address
+from cast_interactor import ALLOWANCE_SIG, PERMIT2_ALLOWANCE_SIG, CastInteractor, encode_call
+
+try:
+    from gmpy2 import mpz
+except ImportError:  # optional speed-up for repeated quotes; plain ints give identical results
+    mpz = int
 
 logger = logging.getLogger(__name__)
 
+# Pair addresses and token0 never change once a pair exists, so lookups persist across runs
+PAIR_CACHE_PATH = os.path.expanduser("~/.cache/uniswap_pairs.json")
+
+# Function selectors, hashed once at import
+_SEL_GET_PAIR = keccak(text="getPair(address,address)")[:4]
+_SEL_GET_RESERVES = keccak(text="getReserves()")[:4]
+_SEL_TOKEN0 = keccak(text="token0()")[:4]
+_SEL_SWAP_EXACT = keccak(text="swapExactTokensForTokens(uint256,uint256,address[],address,uint256)")[:4]
+_SEL_PAIR_INFO = keccak(text="info(address,address,address)")[:4]
+_SEL_ADD_LIQ = keccak(text="addLiquidity(address,address,uint256,uint256,uint256,uint256,address,uint256)")[:4]
+_SEL_EXECUTE = keccak(text="execute(bytes,bytes[],uint256)")[:4]
+
+# Argument types of the router writes, in signature order
+_SWAP_EXACT_TYPES = ["uint256", "uint256", "address[]", "address", "uint256"]
+_ADD_LIQ_TYPES = ["address", "address", "uint256", "uint256", "uint256", "uint256", "address", "uint256"]
+_EXECUTE_TYPES = ["bytes", "bytes[]", "uint256"]
+
+# Calldata of the argument-less reads is just the selector
+_GET_RESERVES_CALL = "0x" + _SEL_GET_RESERVES.hex()
+_TOKEN0_CALL = "0x" + _SEL_TOKEN0.hex()
+
+# Universal Router command bytes and the Permit2 types signed for PERMIT2_PERMIT
+PERMIT2_PERMIT = 0x0a
+V2_SWAP_EXACT_IN = 0x08
+PERMIT_SINGLE_TYPE = "((address,uint160,uint48,uint48),address,uint256)"
+# V2_SWAP_EXACT_IN input: recipient, amountIn, amountOutMin, path, payerIsUser
+V2_SWAP_EXACT_IN_TYPES = ["address", "uint256", "uint256", "address[]", "bool"]
+PERMIT_SINGLE_TYPES = {
+    "PermitSingle": [
+        {"name": "details", "type": "PermitDetails"},
+        {"name": "spender", "type": "address"},
+        {"name": "sigDeadline", "type": "uint256"},
+    ],
+    "PermitDetails": [
+        {"name": "token", "type": "address"},
+        {"name": "amount", "type": "uint160"},
+        {"name": "expiration", "type": "uint48"},
+        {"name": "nonce", "type": "uint48"},
+    ],
+}
+
+# Runtime bytecode of src/PairInfoHelper.sol as written by `forge build`, and the empty
+# address its code is placed at (via an eth_call state override) to run it undeployed
+PAIR_INFO_HELPER_ARTIFACT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "out", "PairInfoHelper.sol", "PairInfoHelper.json"
+)
+PAIR_INFO_HELPER_ADDRESS = "0x00000000000000000000000000000000000fa1e0"
+
+# keccak256 of the UniswapV2Pair creation code, which the factory deploys with CREATE2
+UNISWAP_V2_PAIR_INIT_CODE_HASH = bytes.fromhex("96e8ac4277198ff8b6f785478aa9a39f403cb768dd02cbee326c3e7da348845f")
+
+
+def compute_pair_address(token_a: str, token_b: str, factory: str,
+                         init_code_hash: bytes = UNISWAP_V2_PAIR_INIT_CODE_HASH) -> str:
+    """Derive the CREATE2 address of the Uniswap V2 pair for two tokens without any RPC call"""
+    token0, token1 = sorted((bytes.fromhex(token_a[2:]), bytes.fromhex(token_b[2:])))
+    salt = keccak(token0 + token1)
+    return to_checksum_address(keccak(b"\xff" + bytes.fromhex(factory[2:]) + salt + init_code_hash)[12:])
+
+
+def sign_permit_single(private_key: str, chain_id: int, permit2: str, token: str, amount: int,
+                       nonce: int, spender: str, deadline: int):
+    """Sign a Permit2 PermitSingle whose allowance and signature both expire at deadline"""
+    # LocalAccount has no sign_typed_data in the pinned eth-account, only the Account class does
+    return Account.sign_typed_data(
+        private_key,
+        domain_data={"name": "Permit2", "chainId": chain_id, "verifyingContract": permit2},
+        message_types=PERMIT_SINGLE_TYPES,
+        message_data={
+            "details": {"token": token, "amount": amount, "expiration": deadline, "nonce": nonce},
+            "spender": spender,
+            "sigDeadline": deadline,
+        },
+    )
+
+
+class PairView(NamedTuple):
+    """A Uniswap pair's reserves, labelled by which side holds the campaign token"""
+    pair: str
+    token0: str
+    token_reserve: int
+    usdc_reserve: int
+
+
+def _load_pair_info_helper_code() -> Optional[str]:
+    """Read PairInfoHelper's runtime bytecode from the forge build output (None if not built)"""
+    try:
+        with open(PAIR_INFO_HELPER_ARTIFACT) as f:
+            return json.load(f)["deployedBytecode"]["object"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
 class UniswapV2Helper:
     """Helper class for Uniswap V2 interactions on Sepolia"""
     
     # Sepolia Uniswap V2 addresses
     ROUTER_ADDRESS = "0xeE567Fe1712Faf6149d80dA1E6934E354124CfE3"
     FACTORY_ADDRESS = "0xF62c03E08ada871A0bEb309762E260a7a6a880E6"
+    # Universal Router and Permit2, used for single-transaction swaps when use_permit2 is set
+    UNIVERSAL_ROUTER_ADDRESS = "0x3fC91A3afd70395Cd496C647d5a6CC9D4B2b7FAD"
+    PERMIT2_ADDRESS = "0x000000000022D473030F116dDEE9F6B43aC78BA3"
+    # How long a "pair does not exist" answer is trusted before asking the factory again (seconds)
+    MISSING_PAIR_TTL = 30
+    # Normalized once for pair cache keys
+    _FACTORY_KEY = FACTORY_ADDRESS.lower()
     
-    def __init__(self, cast: CastInteractor):
+    def __init__(self, cast: CastInteractor, cache_path: str = PAIR_CACHE_PATH, use_permit2: bool = False):
         self.cast = cast
+        self.use_permit2 = use_permit2
+        # Swap and liquidity recipient; a pure function of the interactor's key
+        self._account_address = cast.get_account_address()
+        self._cache_path = cache_path
+        self._cache_lock = threading.Lock()
+        self._cache = self._load_cache()
+        # Pairs recently found missing, mapped to when that answer expires; kept in memory
+        # only, since a missing pair can be created at any time
+        self._missing_pairs: Dict[str, float] = {}
+        # Without a forge build the helper is unavailable and reads fall back to multicall
+        self._pair_info_code = _load_pair_info_helper_code()
+        if self._pair_info_code is None:
+            logger.info("PairInfoHelper not built (%s), pair reads use Multicall3", PAIR_INFO_HELPER_ARTIFACT)
+    
+    def _load_cache(self) -> dict:
+        """Load cached pair lookups from disk (empty if missing or unreadable)"""
+        try:
+            with open(self._cache_path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        cache.setdefault("pairs", {})
+        cache.setdefault("token0", {})
+        return cache
+    
+    def _cache_put(self, section: str, key: str, value: str):
+        """Store an immutable lookup result and write the cache back to disk"""
+        with self._cache_lock:
+            self._cache[section][key] = value
+            try:
+                os.makedirs(os.path.dirname(self._cache_path), exist_ok=True)
+                # Write to a temporary file first so a crash never leaves a truncated cache
+                tmp_path = f"{self._cache_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(self._cache, f)
+                os.replace(tmp_path, self._cache_path)
+            except OSError as e:
+                logger.warning("Could not write pair cache: %s", e)
+    
+    def _pair_key(self, token_a: str, token_b: str) -> str:
+        """Cache key of a pair: the factory plus the token addresses in sorted order"""
+        return ":".join([self._FACTORY_KEY, *sorted((token_a.lower(), token_b.lower()))])
+    
+    def _recently_missing(self, key: str) -> bool:
+        """Whether the pair was found missing less than MISSING_PAIR_TTL seconds ago"""
+        return time.monotonic() < self._missing_pairs.get(key, 0.0)
     
     def get_pair_address(self, token_a: str, token_b: str) -> Optional[str]:
-        """Get the pair address for two tokens"""
-        result = self.cast.run_cast_command([
-            "call", self.FACTORY_ADDRESS,
-            "getPair(address,address)(address)", token_a, token_b
-        ])
+        """Get the pair address for two tokens (cached on disk once the pair exists)"""
+        key = self._pair_key(token_a, token_b)
+        cached = self._cache["pairs"].get(key)
+        if cached:
+            return cached
+        if self._recently_missing(key):
+            return None
         
-        if result and result != "0x0000000000000000000000000000000000000000":
-            # Format address properly
-            clean_addr = result[2:].zfill(40)
-            return f"0x{clean_addr}"
+        # The pair address is known up front; it only needs checking that the pair is deployed
+        pair_address = compute_pair_address(token_a, token_b, self.FACTORY_ADDRESS)
+        code = self.cast.get_code(pair_address)
+        if code and code != "0x":
+            self._cache_put("pairs", key, pair_address)
+            return pair_address
+        
+        # Not deployed (or a factory with a different init code hash): ask the factory
+        result = self.cast.eth_call(
+            self.FACTORY_ADDRESS, "0x" + (_SEL_GET_PAIR + encode(["address", "address"], [token_a, token_b])).hex()
+        )
+        
+        if not result:
+            return None
+        
+        # The address sits in the low 20 bytes of the returned 32-byte word
+        addr_bytes = bytes.fromhex(result[2:])[-20:]
+        if any(addr_bytes):
+            pair_address = to_checksum_address(addr_bytes)
+            self._cache_put("pairs", key, pair_address)
+            self._missing_pairs.pop(key, None)
+            return pair_address
+        self._missing_pairs[key] = time.monotonic() + self.MISSING_PAIR_TTL
         return None
     
-    def get_reserves(self, pair_address: str) -> Optional[Tuple[int, int]]:
-        """Get reserves from a Uniswap pair"""
-        result = self.cast.run_cast_command([
-            "call", pair_address,
-            "getReserves()(uint112,uint112,uint32)"
-        ])
+    def get_pair_info(self, token_a: str, token_b: str) -> Optional[Tuple[Optional[str], Optional[str], int, int]]:
+        """Resolve (pair, token0, reserve0, reserve1) in one eth_call through PairInfoHelper
         
-        if not result:
+        Returns None when the helper is unavailable or the call fails; pair is None if it does not exist.
+        """
+        if not self._pair_info_code:
             return None
         
-        try:
-            # Parse the tuple result - this is simplified
-            # In production, you'd want more robust tuple parsing
-            parts = result.strip("()").split(",")
-            if len(parts) >= 2:
-                reserve0 = int(parts[0].strip(), 16)
-                reserve1 = int(parts[1].strip(), 16)
-                return reserve0, reserve1
-        except Exception as e:
-            logger.error(f"Error parsing reserves: {e}")
+        data = _SEL_PAIR_INFO + encode(["address", "address", "address"], [self.FACTORY_ADDRESS, token_a, token_b])
+        result = self.cast.eth_call(
+            PAIR_INFO_HELPER_ADDRESS, "0x" + data.hex(),
+            state_override={PAIR_INFO_HELPER_ADDRESS: {"code": self._pair_info_code}},
+        )
+        # A node that ignores state overrides runs an empty account and answers "0x"
+        if not result or len(result) < 2 + 4 * 64:
+            return None
         
-        return None
+        pair_address, token0, reserve0, reserve1 = decode(
+            ["address", "address", "uint112", "uint112"], bytes.fromhex(result[2:])
+        )
+        key = self._pair_key(token_a, token_b)
+        if int(pair_address, 16) == 0:
+            self._missing_pairs[key] = time.monotonic() + self.MISSING_PAIR_TTL
+            return None, None, 0, 0
+        
+        token0 = token0.lower()
+        self._cache_put("pairs", key, pair_address)
+        self._cache_put("token0", pair_address.lower(), token0)
+        return pair_address, token0, reserve0, reserve1
+    
+    def get_reserves(self, pair_address: str) -> Optional[Tuple[int, int]]:
+        """Get reserves from a Uniswap pair"""
+        result = self.cast.eth_call(pair_address, _GET_RESERVES_CALL)
+        return self._decode_reserves(result) if result else None
+        
+    @staticmethod
+    def _decode_reserves(result: str) -> Tuple[int, int]:
+        """Decode raw getReserves() return data into (reserve0, reserve1)"""
+        # blockTimestampLast is the third word and is never used, so only the first two are decoded
+        return decode(["uint112", "uint112"], bytes.fromhex(result[2:130]))
     
     def get_amount_out(self, amount_in: int, reserve_in: int, reserve_out: int) -> int:
         """Calculate output amount for a swap (simplified Uniswap formula)"""
-        if reserve_in == 0 or reserve_out == 0:
-            return 0
-        
         # Uniswap V2 formula: amountOut = (amountIn * 997 * reserveOut) / (reserveIn * 1000 + amountIn * 997)
-        amount_in_with_fee = amount_in * 997
-        numerator = amount_in_with_fee * reserve_out
-        denominator = reserve_in * 1000 + amount_in_with_fee
-        
-        return numerator // denominator if denominator > 0 else 0
+        # With both reserves non-zero the denominator is positive, so no separate check is needed
+        amount_in_with_fee = mpz(amount_in) * 997
+        return (
+            int(amount_in_with_fee * reserve_out // (mpz(reserve_in) * 1000 + amount_in_with_fee))
+            if reserve_in and reserve_out else 0
+        )
     
     def swap_tokens_for_usdc(self, token_address: str, usdc_address: str, 
                            token_amount: int, min_usdc_out: int = 0) -> bool:
         """Swap campaign tokens for USDC on Uniswap V2"""
-        logger.info(f"Swapping {token_amount} tokens for USDC")
+        logger.info("Swapping %d tokens for USDC", token_amount)
+        
+        if self.use_permit2:
+            return self._swap_with_permit2(token_address, usdc_address, token_amount, min_usdc_out)
         
         # First approve router to spend tokens
         if not self.cast.approve_token(token_address, self.ROUTER_ADDRESS, token_amount):
             logger.error("Failed to approve token spending for router")
             return False
         
-        # Get current account address
-        account_result = self.cast.run_cast_command([
-            "wallet", "address", self.cast.private_key
-        ])
-        
-        if not account_result:
-            logger.error("Failed to get account address")
-            return False
-        
-        account_address = account_result.strip()
-        
         # Calculate deadline (current time + 10 minutes)
-        import time
         deadline = int(time.time()) + 600
         
         # Execute swap
-        result = self.cast.run_cast_command([
-            "send", self.ROUTER_ADDRESS,
-            "swapExactTokensForTokens(uint256,uint256,address[],address,uint256)",
-            str(token_amount),
-            str(min_usdc_out),
-            f"[{token_address},{usdc_address}]",  # Path
-            account_address,  # Recipient
-            str(deadline),
+        data = _SEL_SWAP_EXACT + encode(_SWAP_EXACT_TYPES, [
+            token_amount,
+            min_usdc_out,
+            [token_address, usdc_address],  # Path
+            self._account_address,  # Recipient
+            deadline,
         ])
+        result = self.cast.send_transaction(self.ROUTER_ADDRESS, "0x" + data.hex())
         
         if result:
-            logger.info(f"Token swap successful: {result}")
+            logger.info("Token swap successful: %s", result)
             return True
         else:
             logger.error("Token swap failed")
             return False
     
-    def add_liquidity(self, token_a: str, token_b: str, amount_a: int, 
-                     amount_b: int, min_a: int = 0, min_b: int = 0) -> bool:
-        """Add liquidity to a Uniswap V2 pair"""
-        logger.info(f"Adding liquidity: {amount_a} tokenA + {amount_b} tokenB")
+    def _swap_with_permit2(self, token_address: str, usdc_address: str,
+                           token_amount: int, min_usdc_out: int) -> bool:
+        """Swap through the Universal Router, signing the Permit2 allowance into the same transaction"""
+        owner = self._account_address
         
-        # Approve both tokens
-        if not self.cast.approve_token(token_a, self.ROUTER_ADDRESS, amount_a):
+        # Permit2 pulls tokens under a standing ERC20 allowance, granted once per token
+        allowance = self.cast.eth_call(
+            token_address, encode_call(ALLOWANCE_SIG, owner, self.PERMIT2_ADDRESS)
+        )
+        if not allowance:
             return False
+        if int(allowance, 16) < token_amount:
+            if not self.cast.approve_token(token_address, self.PERMIT2_ADDRESS, 2**256 - 1):
+                logger.error("Failed to approve Permit2 for the campaign token")
+                return False
         
-        if not self.cast.approve_token(token_b, self.ROUTER_ADDRESS, amount_b):
+        # The permit nonce is tracked by Permit2 per (owner, token, spender)
+        result = self.cast.eth_call(self.PERMIT2_ADDRESS, encode_call(
+            PERMIT2_ALLOWANCE_SIG, owner, token_address, self.UNIVERSAL_ROUTER_ADDRESS
+        ))
+        if not result:
             return False
+        _, _, nonce = decode(["uint160", "uint48", "uint48"], bytes.fromhex(result[2:]))
         
-        # Get account address
-        account_result = self.cast.run_cast_command([
-            "wallet", "address", self.cast.private_key
-        ])
+        deadline = int(time.time()) + 600
+        signed = sign_permit_single(
+            self.cast.private_key, self.cast.client.get_chain_id(), self.PERMIT2_ADDRESS,
+            token_address, token_amount, nonce, self.UNIVERSAL_ROUTER_ADDRESS, deadline,
+        )
         
-        if not account_result:
-            return False
+        permit_single = ((token_address, token_amount, deadline, nonce), self.UNIVERSAL_ROUTER_ADDRESS, deadline)
+        inputs = [
+            encode([PERMIT_SINGLE_TYPE, "bytes"], [permit_single, bytes(signed.signature)]),
+            # payerIsUser: the router pulls the tokens from the owner via Permit2
+            encode(V2_SWAP_EXACT_IN_TYPES, [owner, token_amount, min_usdc_out, [token_address, usdc_address], True]),
+        ]
+        data = _SEL_EXECUTE + encode(_EXECUTE_TYPES, [bytes([PERMIT2_PERMIT, V2_SWAP_EXACT_IN]), inputs, deadline])
+        result = self.cast.send_transaction(self.UNIVERSAL_ROUTER_ADDRESS, "0x" + data.hex())
+        
+        if result:
+            logger.info("Token swap successful: %s", result)
+            return True
+        logger.error("Token swap failed")
+        return False
+    
+    def add_liquidity(self, token_a: str, token_b: str, amount_a: int, 
+                     amount_b: int, min_a: int = 0, min_b: int = 0) -> bool:
+        """Add liquidity to a Uniswap V2 pair"""
+        logger.info("Adding liquidity: %d tokenA + %d tokenB", amount_a, amount_b)
         
-        account_address = account_result.strip()
+        # Approve both tokens concurrently; the signer hands out consecutive nonces,
+        # so both approvals are broadcast at once and confirm in the same block or two
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            approvals = [
+                executor.submit(self.cast.approve_token, token_a, self.ROUTER_ADDRESS, amount_a),
+                executor.submit(self.cast.approve_token, token_b, self.ROUTER_ADDRESS, amount_b),
+            ]
+        if not all(approval.result() for approval in approvals):
+            return False
         
         # Calculate deadline
-        import time
         deadline = int(time.time()) + 600
         
         # Add liquidity
-        result = self.cast.run_cast_command([
-            "send", self.ROUTER_ADDRESS,
-            "addLiquidity(address,address,uint256,uint256,uint256,uint256,address,uint256)",
+        data = _SEL_ADD_LIQ + encode(_ADD_LIQ_TYPES, [
             token_a, token_b,
-            str(amount_a), str(amount_b),
-            str(min_a), str(min_b),
-            account_address,
-            str(deadline),
+            amount_a, amount_b,
+            min_a, min_b,
+            self._account_address,
+            deadline,
         ])
+        result = self.cast.send_transaction(self.ROUTER_ADDRESS, "0x" + data.hex())
         
         return result is not None
     
+    def get_pair_view(self, campaign_token: str, usdc_address: str) -> Optional[PairView]:
+        """Look up the campaign token's USDC pair and its reserves, oriented by token0"""
+        # A pair not cached yet is resolved together with token0 and reserves in one helper call,
+        # unless it was just found missing (get_pair_address then answers from that negative entry)
+        info = None
+        key = self._pair_key(campaign_token, usdc_address)
+        if key not in self._cache["pairs"] and not self._recently_missing(key):
+            info = self.get_pair_info(campaign_token, usdc_address)
+        
+        if info is not None:
+            pair_address, token0, reserve0, reserve1 = info
+            reserves = (reserve0, reserve1) if pair_address else None
+        else:
+            # Check if pair exists
+            pair_address = self.get_pair_address(campaign_token, usdc_address)
+            if pair_address:
+                # token0 is fixed when the pair is created, so it is only read on the first swap
+                token0 = self._cache["token0"].get(pair_address.lower())
+                if token0 is None:
+                    # Reserves and token0 both depend only on the pair, so read them in one Multicall3 call
+                    reserves_result, token0_result = self.cast.multicall3([
+                        (pair_address, _GET_RESERVES_CALL),
+                        (pair_address, _TOKEN0_CALL),
+                    ])
+                    if token0_result:
+                        token0 = "0x" + bytes.fromhex(token0_result[2:])[-20:].hex()
+                        self._cache_put("token0", pair_address.lower(), token0)
+                else:
+                    reserves_result = self.cast.eth_call(pair_address, _GET_RESERVES_CALL)
+                reserves = self._decode_reserves(reserves_result) if reserves_result else None
+        
+        if not pair_address:
+            logger.error("No Uniswap pair found for campaign token")
+            return None
+        if not reserves:
+            logger.error("Could not get pair reserves")
+            return None
+        if not token0:
+            logger.error("Could not get token0 address")
+            return None
+        
+        # Determine which reserve is which token
+        reserve0, reserve1 = reserves
+        if campaign_token.lower() == token0:
+            return PairView(pair_address, token0, reserve0, reserve1)
+        return PairView(pair_address, token0, reserve1, reserve0)
+    
     def test_token_swap(self, campaign_token_address: str, usdc_address: str, 
-                       swap_amount: int) -> bool:
-        """Test swapping campaign tokens for USDC"""
+                       swap_amount: int, slippage_bps: int = 500) -> bool:
+        """Test swapping campaign tokens for USDC (slippage tolerance in basis points)"""
         logger.info("Testing token swap functionality")
         
         try:
-            # Check if pair exists
-            pair_address = self.get_pair_address(campaign_token_address, usdc_address)
-            if not pair_address:
-                logger.error("No Uniswap pair found for campaign token")
-                return False
-            
-            logger.info(f"Found Uniswap pair at: {pair_address}")
-            
-            # Get reserves to verify liquidity
-            reserves = self.get_reserves(pair_address)
-            if not reserves:
-                logger.error("Could not get pair reserves")
+            view = self.get_pair_view(campaign_token_address, usdc_address)
+            if view is None:
                 return False
             
-            reserve0, reserve1 = reserves
-            logger.info(f"Pair reserves: {reserve0}, {reserve1}")
+            logger.info("Found Uniswap pair at: %s", view.pair)
+            logger.info("Pair reserves: %d tokens, %d USDC", view.token_reserve, view.usdc_reserve)
             
-            if reserve0 == 0 or reserve1 == 0:
+            if view.token_reserve == 0 or view.usdc_reserve == 0:
                 logger.error("Pair has no liquidity")
                 return False
             
-            # Determine which reserve is which token
-            token0_result = self.cast.run_cast_command([
-                "call", pair_address, "token0()(address)"
-            ])
-            
-            if not token0_result:
-                logger.error("Could not get token0 address")
-                return False
-            
-            token0 = token0_result.lower()
-            is_token0_campaign_token = campaign_token_address.lower() == token0
-            
-            if is_token0_campaign_token:
-                token_reserve = reserve0
-                usdc_reserve = reserve1
-            else:
-                token_reserve = reserve1
-                usdc_reserve = reserve0
-            
             # Calculate expected USDC output
-            expected_usdc_out = self.get_amount_out(swap_amount, token_reserve, usdc_reserve)
-            min_usdc_out = int(expected_usdc_out * 0.95)  # 5% slippage tolerance
+            expected_usdc_out = self.get_amount_out(swap_amount, view.token_reserve, view.usdc_reserve)
+            # Integer math keeps full precision for 18-decimal amounts
+            min_usdc_out = expected_usdc_out * (10_000 - slippage_bps) // 10_000
             
-            logger.info(f"Expected USDC out: {expected_usdc_out / 10**6:.6f} USDC")
-            logger.info(f"Minimum USDC out: {min_usdc_out / 10**6:.6f} USDC")
+            logger.info("Expected USDC out: %.6f USDC", expected_usdc_out / 1_000_000)
+            logger.info("Minimum USDC out: %.6f USDC", min_usdc_out / 1_000_000)
             
             # Execute the swap
             return self.swap_tokens_for_usdc(
@@ -214,5 +455,5 @@ class UniswapV2Helper:
             )
             
         except Exception as e:
-            logger.error(f"Token swap test failed: {e}")
+            logger.error("Token swap test failed: %s", e)
             return False
\ No newline at end of file
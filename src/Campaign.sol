@@ -4,6 +4,7 @@ pragma solidity ^0.8.24;
 import "@openzeppelin/contracts/utils/ReentrancyGuard.sol";
 import "@openzeppelin/contracts/access/Ownable.sol";
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/extensions/IERC20Permit.sol";
 import "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
 import "./interfaces/ICampaignStructs.sol";
 import "./interfaces/ICampaignInterfaces.sol";
@@ -89,6 +90,23 @@ contract Campaign is ICampaign, ICampaignEvents, ReentrancyGuard, Ownable {
     }
 
     function contribute(uint256 amount) external nonReentrant onlyActiveState campaignNotExpired {
+        _contribute(amount);
+    }
+
+    function contributeWithPermit(uint256 amount, uint256 permitDeadline, uint8 v, bytes32 r, bytes32 s)
+        external
+        nonReentrant
+        onlyActiveState
+        campaignNotExpired
+    {
+        // A front-run permit consumes the nonce but still sets the allowance, so don't revert here;
+        // the transfer in _contribute fails if the allowance is missing.
+        IERC20Permit permitToken = IERC20Permit(address(usdcToken));
+        try permitToken.permit(msg.sender, address(this), amount, permitDeadline, v, r, s) {} catch {}
+        _contribute(amount);
+    }
+
+    function _contribute(uint256 amount) internal {
         require(amount >= MIN_CONTRIBUTION, "Campaign: Contribution below minimum");
 
         uint256 tokenAllocation = pricingCurve.calculateTokenAllocation(amount, campaignData.fundingGoal);
@@ -0,0 +1,23 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.24;
+
+import "./DEXIntegrator.sol";
+
+// Read-only lens over a Uniswap V2 pair. It is never deployed: off-chain tooling places its
+// runtime code at an unused address with an eth_call state override, so resolving the pair,
+// token0 and reserves costs a single RPC call.
+contract PairInfoHelper {
+    function info(address factory, address tokenA, address tokenB)
+        external
+        view
+        returns (address pair, address token0, uint112 reserve0, uint112 reserve1)
+    {
+        pair = IUniswapV2Factory(factory).getPair(tokenA, tokenB);
+        if (pair == address(0)) {
+            return (pair, address(0), 0, 0);
+        }
+
+        token0 = IUniswapV2Pair(pair).token0();
+        (reserve0, reserve1,) = IUniswapV2Pair(pair).getReserves();
+    }
+}
@@ -22,6 +22,7 @@ interface ICrowdfundingFactory {
 
 interface ICampaign {
     function contribute(uint256 amount) external;
+    function contributeWithPermit(uint256 amount, uint256 permitDeadline, uint8 v, bytes32 r, bytes32 s) external;
     function claimTokens() external;
     function withdrawFunds() external;
     function refund() external;
@@ -2,12 +2,13 @@
 pragma solidity ^0.8.24;
 
 import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/extensions/ERC20Permit.sol";
 import "@openzeppelin/contracts/access/Ownable.sol";
 
-contract MockUSDC is ERC20, Ownable {
+contract MockUSDC is ERC20, ERC20Permit, Ownable {
     uint8 private _decimals;
 
-    constructor() ERC20("USD Coin", "USDC") Ownable(msg.sender) {
+    constructor() ERC20("USD Coin", "USDC") ERC20Permit("USD Coin") Ownable(msg.sender) {
         _decimals = 6; // USDC has 6 decimals
         _mint(msg.sender, 1000000000 * 10 ** _decimals); // Mint 1 billion USDC to deployer
     }
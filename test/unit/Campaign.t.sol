@@ -96,6 +96,45 @@ contract CampaignTest is BaseTest {
         vm.stopPrank();
     }
 
+    function test_ContributeWithPermit_Success() public {
+        (address signer, uint256 signerKey) = makeAddrAndKey("permitContributor");
+        vm.prank(deployer);
+        usdcToken.transfer(signer, INITIAL_USDC_BALANCE);
+
+        uint256 amount = 1000e6; // 1000 USDC
+        uint256 deadline = block.timestamp + 1 hours;
+        (uint8 v, bytes32 r, bytes32 s) = signPermit(signerKey, signer, address(campaign), amount, deadline);
+
+        vm.prank(signer);
+        campaign.contributeWithPermit(amount, deadline, v, r, s);
+
+        assertContributionExists(campaignId, signer, amount);
+        assertEq(usdcToken.balanceOf(signer), INITIAL_USDC_BALANCE - amount);
+        assertEq(usdcToken.nonces(signer), 1);
+    }
+
+    function test_ContributeWithPermit_ExistingAllowance() public {
+        // A permit that fails (e.g. already used by a front-runner) still lets an existing allowance through
+        uint256 amount = 1000e6; // 1000 USDC
+        vm.startPrank(contributor1);
+        usdcToken.approve(address(campaign), amount);
+        campaign.contributeWithPermit(amount, block.timestamp, 0, bytes32(0), bytes32(0));
+        vm.stopPrank();
+
+        assertContributionExists(campaignId, contributor1, amount);
+    }
+
+    function test_ContributeWithPermit_InvalidSignature() public {
+        (, uint256 otherKey) = makeAddrAndKey("otherSigner");
+        uint256 amount = 1000e6; // 1000 USDC
+        uint256 deadline = block.timestamp + 1 hours;
+        (uint8 v, bytes32 r, bytes32 s) = signPermit(otherKey, contributor1, address(campaign), amount, deadline);
+
+        vm.prank(contributor1);
+        vm.expectRevert();
+        campaign.contributeWithPermit(amount, deadline, v, r, s);
+    }
+
     function test_StablePricing() public {
         uint256 contributionAmount = 1000e6; // 1000 USDC
 
@@ -0,0 +1,43 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.24;
+
+import "../utils/BaseTest.sol";
+import "../../src/PairInfoHelper.sol";
+
+contract PairInfoHelperTest is BaseTest {
+    PairInfoHelper public helper;
+    address public token = makeAddr("token");
+
+    function setUp() public override {
+        super.setUp();
+        helper = new PairInfoHelper();
+    }
+
+    function test_Info_ReturnsPairToken0AndReserves() public {
+        address pair = mockUniswapFactory.createPair(token, address(usdcToken));
+        vm.mockCall(pair, abi.encodeWithSelector(IUniswapV2Pair.token0.selector), abi.encode(token));
+        vm.mockCall(
+            pair,
+            abi.encodeWithSelector(IUniswapV2Pair.getReserves.selector),
+            abi.encode(uint112(500e18), uint112(1000e6), uint32(block.timestamp))
+        );
+
+        (address foundPair, address token0, uint112 reserve0, uint112 reserve1) =
+            helper.info(address(mockUniswapFactory), address(usdcToken), token);
+
+        assertEq(foundPair, pair);
+        assertEq(token0, token);
+        assertEq(reserve0, 500e18);
+        assertEq(reserve1, 1000e6);
+    }
+
+    function test_Info_MissingPairReturnsZeroes() public view {
+        (address pair, address token0, uint112 reserve0, uint112 reserve1) =
+            helper.info(address(mockUniswapFactory), token, address(usdcToken));
+
+        assertEq(pair, address(0));
+        assertEq(token0, address(0));
+        assertEq(reserve0, 0);
+        assertEq(reserve1, 0);
+    }
+}
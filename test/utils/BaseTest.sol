@@ -21,6 +21,8 @@ contract BaseTest is Test {
     uint256 constant MIN_CONTRIBUTION = 1e6; // 1 USDC
     uint256 constant CREATOR_RESERVE = 25; // 25%
     uint256 constant LIQUIDITY_PERCENTAGE = 30; // 30%
+    bytes32 constant PERMIT_TYPEHASH =
+        keccak256("Permit(address owner,address spender,uint256 value,uint256 nonce,uint256 deadline)");
 
     // Test accounts
     address deployer = makeAddr("deployer");
@@ -104,6 +106,17 @@ contract BaseTest is Test {
         vm.stopPrank();
     }
 
+    function signPermit(uint256 signerKey, address owner, address spender, uint256 value, uint256 deadline)
+        internal
+        view
+        returns (uint8 v, bytes32 r, bytes32 s)
+    {
+        bytes32 structHash =
+            keccak256(abi.encode(PERMIT_TYPEHASH, owner, spender, value, usdcToken.nonces(owner), deadline));
+        bytes32 digest = keccak256(abi.encodePacked("\x19\x01", usdcToken.DOMAIN_SEPARATOR(), structHash));
+        return vm.sign(signerKey, digest);
+    }
+
     function fastForwardToDeadline(uint256 campaignId) internal {
         CampaignData memory data = factory.getCampaign(campaignId);
         vm.warp(data.deadline + 1);